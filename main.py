@@ -2,21 +2,25 @@
 
 import math
 import streamlit as st
-import plotly.express as px
+import altair as alt
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import Dict, Any
 import numpy as np
+import pandas as pd
+from mortgage_kernels import COMPARISON_POINTS, SWEEP_RAMP, payment_factor, load_mortgage_batch
 
 # Constants
 PROPERTY_TAX_RATE = 0.007  # 0.7% property tax rate for Redmond, WA
 DEFAULT_INSURANCE_ANNUAL = 2200  # Annual homeowners insurance for Redmond, WA
+BASE_LAYOUT = dict(height=400)  # Layout shared by the single-panel charts
+SCENARIO_TYPES = ('Price Variation', 'Rate Variation', 'Down Payment Variation')
+HEATMAP_POINTS = 50  # Points per axis of the price x rate affordability grid
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MortgageScenario:
-    """Data class representing a mortgage scenario"""
+    """Immutable data class representing a mortgage scenario (usable as a cache key)"""
     home_price: float
     down_payment_amount: float
     interest_rate: float
@@ -28,6 +32,23 @@ class MortgageScenario:
     hoa_monthly: float = 0
 
 
+@dataclass(frozen=True, slots=True)
+class ComparisonArrays:
+    """Columnar results for one comparison sweep"""
+    variable_value: np.ndarray
+    monthly_payment: np.ndarray
+    front_end_ratio: np.ndarray
+    affordable: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class AffordabilityGrid:
+    """Front-end DTI ratio over a grid of home prices (rows) and interest rates (columns)"""
+    home_price: np.ndarray
+    interest_rate: np.ndarray
+    front_end_ratio: np.ndarray
+
+
 class MortgageModel:
     """Model class handling all mortgage calculations"""
     
@@ -40,8 +61,9 @@ class MortgageModel:
         monthly_rate = annual_rate / 12 / 100
         num_payments = years * 12
         
-        monthly_payment = principal * (monthly_rate * (1 + monthly_rate) ** num_payments) / \
-                         ((1 + monthly_rate) ** num_payments - 1)
+        # (1 + r)^n - 1 via expm1/log1p stays accurate for tiny rates, where pow() would cancel
+        growth_less_one = math.expm1(num_payments * math.log1p(monthly_rate))
+        monthly_payment = principal * monthly_rate * (growth_less_one + 1.0) / growth_less_one
         
         return monthly_payment
     
@@ -63,6 +85,8 @@ class MortgageModel:
         # Debt-to-income ratios
         front_end_ratio = (total_monthly_payment / scenario.monthly_income) * 100
         back_end_ratio = ((total_monthly_payment + scenario.monthly_debts) / scenario.monthly_income) * 100
+        front_end_ok = front_end_ratio <= 28
+        back_end_ok = back_end_ratio <= 36
         
         # Total costs
         total_payments = monthly_pi * scenario.loan_term_years * 12
@@ -75,132 +99,351 @@ class MortgageModel:
             'monthly_pi': monthly_pi,
             'monthly_property_tax': monthly_property_tax,
             'monthly_insurance': monthly_insurance,
+            'monthly_hoa': scenario.hoa_monthly,
             'total_monthly_payment': total_monthly_payment,
             'front_end_ratio': front_end_ratio,
             'back_end_ratio': back_end_ratio,
+            'front_end_ok': front_end_ok,
+            'back_end_ok': back_end_ok,
             'total_payments': total_payments,
             'total_interest': total_interest,
-            'affordable': front_end_ratio <= 28 and back_end_ratio <= 36
+            'affordable': front_end_ok and back_end_ok
         }
     
     @staticmethod
     def generate_comparison_data(base_scenario: MortgageScenario, 
                                price_range: tuple, rate_range: tuple, 
-                               down_payment_range: tuple) -> List[Dict]:
+                               down_payment_range: tuple) -> Dict[str, ComparisonArrays]:
         """Generate data for comparison charts"""
-        data = []
+        num_points = COMPARISON_POINTS
         
-        # Price comparison
-        price_values = np.linspace(price_range[0], price_range[1], 10)
-        for price in price_values:
-            # Keep the same down payment amount, but recalculate percentage for new price
-            scenario = MortgageScenario(
-                home_price=price,
-                down_payment_amount=base_scenario.down_payment_amount,
-                interest_rate=base_scenario.interest_rate,
-                loan_term_years=base_scenario.loan_term_years,
-                monthly_income=base_scenario.monthly_income,
-                monthly_debts=base_scenario.monthly_debts,
-                property_tax_annual=price * PROPERTY_TAX_RATE,
-                insurance_annual=base_scenario.insurance_annual,  # Keep user's insurance, not tied to price
-                hoa_monthly=base_scenario.hoa_monthly
-            )
-            metrics = MortgageModel.calculate_affordability_metrics(scenario)
-            data.append({
-                'scenario_type': 'Price Variation',
-                'variable_value': price,
-                'monthly_payment': metrics['total_monthly_payment'],
-                'front_end_ratio': metrics['front_end_ratio'],
-                'affordable': metrics['affordable']
-            })
+        # One contiguous buffer holding the price, rate and down payment sweeps
+        ranges = np.array([price_range, rate_range, down_payment_range], dtype=float)
+        sweeps = ranges[:, :1] + (ranges[:, 1:] - ranges[:, :1]) * SWEEP_RAMP
+        price_values, rate_values, dp_values = sweeps
         
-        # Rate comparison
-        rate_values = np.linspace(rate_range[0], rate_range[1], 10)
-        for rate in rate_values:
-            scenario = MortgageScenario(
-                home_price=base_scenario.home_price,
-                down_payment_amount=base_scenario.down_payment_amount,
-                interest_rate=rate,
-                loan_term_years=base_scenario.loan_term_years,
-                monthly_income=base_scenario.monthly_income,
-                monthly_debts=base_scenario.monthly_debts,
-                property_tax_annual=base_scenario.property_tax_annual,
-                insurance_annual=base_scenario.insurance_annual,
-                hoa_monthly=base_scenario.hoa_monthly
-            )
-            metrics = MortgageModel.calculate_affordability_metrics(scenario)
-            data.append({
-                'scenario_type': 'Rate Variation',
-                'variable_value': rate,
-                'monthly_payment': metrics['total_monthly_payment'],
-                'front_end_ratio': metrics['front_end_ratio'],
-                'affordable': metrics['affordable']
-            })
+        # Kernel inputs as (input, sweep, point): every input starts at its base value and
+        # each sweep overrides the inputs it varies. The price sweep keeps the same down payment
+        # amount and scales property tax with the price; insurance stays at the user's value
+        # (not tied to price). The payment factor only depends on the rate, so only the rate
+        # sweep needs one per point.
+        inputs = np.empty((4, 3, num_points))
+        inputs[0] = base_scenario.home_price
+        inputs[1] = base_scenario.down_payment_amount
+        inputs[2] = payment_factor(base_scenario.interest_rate, base_scenario.loan_term_years)
+        inputs[3] = base_scenario.property_tax_annual / 12
+        inputs[0, 0] = price_values
+        inputs[3, 0] = price_values * PROPERTY_TAX_RATE / 12
+        inputs[2, 1] = payment_factor(rate_values, base_scenario.loan_term_years)
+        inputs[1, 2] = dp_values
         
-        # Down payment comparison
-        dp_values = np.linspace(down_payment_range[0], down_payment_range[1], 10)
-        for dp_amount in dp_values:
-            scenario = MortgageScenario(
-                home_price=base_scenario.home_price,
-                down_payment_amount=dp_amount,
-                interest_rate=base_scenario.interest_rate,
-                loan_term_years=base_scenario.loan_term_years,
-                monthly_income=base_scenario.monthly_income,
-                monthly_debts=base_scenario.monthly_debts,
-                property_tax_annual=base_scenario.property_tax_annual,
-                insurance_annual=base_scenario.insurance_annual,
-                hoa_monthly=base_scenario.hoa_monthly
+        _, monthly_payments, front_end_ratios, affordable = load_mortgage_batch()(
+            inputs.reshape(4, -1),
+            float(base_scenario.monthly_income),
+            float(base_scenario.monthly_debts),
+            base_scenario.insurance_annual / 12 + base_scenario.hoa_monthly
+        )
+        
+        # One row per sweep, viewed straight out of the kernel's output columns
+        monthly_payments = monthly_payments.reshape(3, num_points)
+        front_end_ratios = front_end_ratios.reshape(3, num_points)
+        affordable = affordable.reshape(3, num_points)
+        
+        return {
+            scenario_type: ComparisonArrays(
+                variable_value=sweeps[i],
+                monthly_payment=monthly_payments[i],
+                front_end_ratio=front_end_ratios[i],
+                affordable=affordable[i]
             )
-            metrics = MortgageModel.calculate_affordability_metrics(scenario)
-            data.append({
-                'scenario_type': 'Down Payment Variation',
-                'variable_value': dp_amount,
-                'monthly_payment': metrics['total_monthly_payment'],
-                'front_end_ratio': metrics['front_end_ratio'],
-                'affordable': metrics['affordable']
-            })
+            for i, scenario_type in enumerate(SCENARIO_TYPES)
+        }
+    
+    @staticmethod
+    def generate_affordability_grid(base_scenario: MortgageScenario, price_range: tuple,
+                                    rate_range: tuple, num_points: int = HEATMAP_POINTS) -> AffordabilityGrid:
+        """Generate front-end DTI ratios for every home price / interest rate pair"""
+        price_values = np.linspace(*price_range, num_points)
+        rate_values = np.linspace(*rate_range, num_points)
         
-        return data
+        # Kernel inputs as (input, price, rate), following the price and rate sweeps above:
+        # the down payment amount is held fixed, property tax scales with price and the
+        # payment factor only depends on the rate
+        inputs = np.empty((4, num_points, num_points))
+        inputs[0] = price_values[:, None]
+        inputs[1] = base_scenario.down_payment_amount
+        inputs[2] = payment_factor(rate_values, base_scenario.loan_term_years)
+        inputs[3] = price_values[:, None] * PROPERTY_TAX_RATE / 12
+        
+        _, _, front_end_ratios, _ = load_mortgage_batch()(
+            inputs.reshape(4, -1),
+            float(base_scenario.monthly_income),
+            float(base_scenario.monthly_debts),
+            base_scenario.insurance_annual / 12 + base_scenario.hoa_monthly
+        )
+        
+        return AffordabilityGrid(
+            home_price=price_values,
+            interest_rate=rate_values,
+            front_end_ratio=front_end_ratios.reshape(num_points, num_points)
+        )
+
+
+@st.cache_data(ttl=3600, max_entries=128)
+def calc_metrics(scenario: MortgageScenario) -> Dict[str, Any]:
+    """Cached affordability metrics keyed on the scenario's field values"""
+    return MortgageModel.calculate_affordability_metrics(scenario)
+
+
+def _sweep_ranges(scenario: MortgageScenario) -> Dict[str, tuple]:
+    """Price, rate and down payment ranges explored around the base scenario"""
+    return {
+        'price_range': (scenario.home_price * 0.7, scenario.home_price * 1.3),
+        'rate_range': (max(1, scenario.interest_rate - 2), scenario.interest_rate + 2),
+        'down_payment_range': (scenario.home_price * 0.05, scenario.home_price * 0.80)  # 5% to 80% of home price
+    }
+
+
+@st.cache_data(ttl=3600, max_entries=128)
+def calc_comparison_data(scenario: MortgageScenario) -> Dict[str, ComparisonArrays]:
+    """Cached comparison data; the sweep ranges are derived from the base scenario"""
+    return MortgageModel.generate_comparison_data(scenario, **_sweep_ranges(scenario))
+
+
+@st.cache_data(ttl=3600, max_entries=128)
+def calc_affordability_grid(scenario: MortgageScenario) -> AffordabilityGrid:
+    """Cached price x rate grid over the same ranges as the comparison sweeps"""
+    ranges = _sweep_ranges(scenario)
+    return MortgageModel.generate_affordability_grid(
+        scenario, price_range=ranges['price_range'], rate_range=ranges['rate_range']
+    )
 
 
-def create_payment_breakdown_chart(metrics: Dict[str, Any]) -> go.Figure:
-    """Create a pie chart showing payment breakdown"""
+def create_metrics_table(metrics: Dict[str, Any]) -> "pd.io.formats.style.Styler":
+    """Create a single styled table of the loan, monthly cost and DTI metrics"""
+    front_ok = metrics['front_end_ok']
+    back_ok = metrics['back_end_ok']
+    table = pd.DataFrame({
+        'Metric': [
+            'Loan Amount', 'Down Payment', 'Monthly P&I',
+            'Property Tax', 'Insurance', 'HOA', 'Total Monthly',
+            'Front-End Ratio', 'Back-End Ratio'
+        ],
+        'Value': [
+            f"${metrics['loan_amount']:,.0f}",
+            f"${metrics['down_payment']:,.0f}",
+            f"${metrics['monthly_pi']:,.0f}",
+            f"${metrics['monthly_property_tax']:,.0f}",
+            f"${metrics['monthly_insurance']:,.0f}",
+            f"${metrics['monthly_hoa']:,.0f}",
+            f"${metrics['total_monthly_payment']:,.0f}",
+            f"{metrics['front_end_ratio']:.1f}%",
+            f"{metrics['back_end_ratio']:.1f}%"
+        ],
+        'Note': [
+            '', f"{metrics['down_payment_percent']:.1f}% of home price", '',
+            '', '', '', '',
+            f"{'✅ Good' if front_ok else '❌ High'} (≤28% recommended)",
+            f"{'✅ Good' if back_ok else '❌ High'} (≤36% recommended)"
+        ]
+    })
+    
+    # Color code the ratio rows
+    row_colors = [''] * 7 + ['color: green' if ok else 'color: red' for ok in (front_ok, back_ok)]
+    return table.style.apply(
+        lambda row: [row_colors[row.name]] * len(row), axis=1, subset=['Value', 'Note']
+    )
+
+
+# Shared across sessions without copying; callers must not mutate the returned chart
+@st.cache_resource(max_entries=64)
+def create_payment_breakdown_chart(monthly_pi: float, monthly_property_tax: float,
+                                   monthly_insurance: float, monthly_hoa: float) -> alt.LayerChart:
+    """Create a donut chart showing payment breakdown"""
+    # A four-slice donut is far lighter to ship as a Vega-Lite spec than as a Plotly figure
     labels = ['Principal & Interest', 'Property Tax', 'Insurance', 'HOA']
-    values = [
-        metrics['monthly_pi'],
-        metrics['monthly_property_tax'],
-        metrics['monthly_insurance'],
-        metrics.get('monthly_hoa', 0)
-    ]
+    values = np.array([monthly_pi, monthly_property_tax, monthly_insurance, monthly_hoa], dtype=float)
     
     # Filter out zero values
-    filtered_labels = []
-    filtered_values = []
-    for label, value in zip(labels, values):
-        if value > 0:
-            filtered_labels.append(label)
-            filtered_values.append(value)
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=filtered_labels,
-        values=filtered_values,
-        hole=0.3,
-        textinfo='label+percent+value',
-        texttemplate='%{label}<br>%{percent}<br>$%{value:,.0f}',
-        marker=dict(colors=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728'])
-    )])
+    mask = values > 0
+    breakdown = pd.DataFrame({
+        'Component': np.array(labels)[mask],
+        'Amount': values[mask],
+        'Order': np.arange(len(labels))[mask]
+    })
+    breakdown['Share'] = breakdown['Amount'] / breakdown['Amount'].sum()
+    # Slice labels are formatted once here, as with the previous pie's precomputed text
+    breakdown['Label'] = [f"${amount:,.0f} · {share:.1%}"
+                          for amount, share in zip(breakdown['Amount'], breakdown['Share'])]
+    
+    base = alt.Chart(breakdown, title="Monthly Payment Breakdown").encode(
+        theta=alt.Theta('Amount:Q', stack=True),
+        # Colors are tied to the component rather than the slice position
+        color=alt.Color('Component:N', sort=labels,
+                        scale=alt.Scale(domain=labels, range=['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728'])),
+        order=alt.Order('Order:Q'),
+        tooltip=[
+            alt.Tooltip('Component:N'),
+            alt.Tooltip('Amount:Q', format='$,.0f'),
+            alt.Tooltip('Share:Q', format='.1%')
+        ]
+    )
+    donut = base.mark_arc(innerRadius=50, outerRadius=130)
+    slice_labels = base.mark_text(radius=165, fontSize=12).encode(text='Label:N')
     
+    return (donut + slice_labels).properties(height=BASE_LAYOUT['height'])
+
+
+def create_payment_line_chart(x_values: np.ndarray, monthly_payments: np.ndarray, title: str,
+                              xaxis_title: str, color: str) -> go.Figure:
+    """Create a line chart of monthly payment against a single varied input"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=x_values,
+        y=monthly_payments,
+        mode='lines+markers',
+        name='Monthly Payment',
+        line=dict(color=color)
+    ))
     fig.update_layout(
-        title="Monthly Payment Breakdown",
-        font=dict(size=12),
-        height=400
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title="Monthly Payment ($)",
+        **BASE_LAYOUT
     )
+    return fig
+
+
+def get_payment_line_chart(state_key: str, x_values: np.ndarray, monthly_payments: np.ndarray,
+                           title: str, xaxis_title: str, color: str) -> go.Figure:
+    """Return this session's line chart for state_key, swapping in new data instead of rebuilding"""
+    fig = st.session_state.get(state_key)
+    if fig is None:
+        fig = st.session_state[state_key] = create_payment_line_chart(
+            x_values, monthly_payments, title, xaxis_title, color
+        )
+    else:
+        # Layout and styling are unchanged between reruns; only the trace data moves
+        with fig.batch_update():
+            fig.data[0].x = x_values
+            fig.data[0].y = monthly_payments
+    return fig
+
+
+@st.cache_data(max_entries=64)
+def create_dti_chart(comparison_data: Dict[str, ComparisonArrays], home_price: float) -> go.Figure:
+    """Create a chart comparing front-end DTI ratios across the scenario types"""
+    fig = go.Figure()
+    colors = {'Price Variation': 'blue', 'Rate Variation': 'red', 'Down Payment Variation': 'green'}
+    traces = []
+    for scenario_type in SCENARIO_TYPES:
+        scenario_data = comparison_data[scenario_type]
+        if scenario_type == 'Down Payment Variation':
+            x_values = scenario_data.variable_value / home_price * 100
+        else:
+            x_values = scenario_data.variable_value
+        
+        traces.append(go.Scatter(
+            x=x_values,
+            y=scenario_data.front_end_ratio,
+            mode='lines+markers',
+            name=f'{scenario_type}',
+            line=dict(color=colors[scenario_type])
+        ))
+    fig.add_traces(traces)
     
+    fig.add_hline(y=28, line_dash="dash", line_color="orange", 
+                  annotation_text="28% DTI Threshold")
+    fig.update_layout(
+        title="DTI Ratio Comparison",
+        xaxis_title="Variable Value",
+        yaxis_title="Front-End DTI Ratio (%)",
+        **BASE_LAYOUT
+    )
     return fig
 
 
-def create_comparison_charts(data: List[Dict]) -> go.Figure:
-    """Create comparison charts for different scenarios"""
+@st.cache_data(max_entries=64)
+def create_affordability_chart(comparison_data: Dict[str, ComparisonArrays]) -> go.Figure:
+    """Create a bar chart of the share of affordable scenarios per type"""
+    # Share of affordable scenarios per type, in price -> rate -> down payment order
+    affordability_counts = {
+        scenario_type: arrays.affordable.mean() * 100
+        for scenario_type, arrays in comparison_data.items()
+    }
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=list(affordability_counts.keys()),
+            y=list(affordability_counts.values()),
+            marker_color=['blue', 'red', 'green'],
+            text=[f"{v:.0f}%" for v in affordability_counts.values()],
+            textposition='auto'
+        )
+    ])
+    fig.update_layout(
+        title="Affordability Rate by Scenario",
+        xaxis_title="Scenario Type",
+        yaxis_title="Affordable Scenarios (%)",
+        **BASE_LAYOUT,
+        yaxis=dict(range=[0, 100])
+    )
+    return fig
+
+
+@st.cache_data(max_entries=64)
+def create_affordability_heatmap(grid: AffordabilityGrid, home_price: float, interest_rate: float) -> go.Figure:
+    """Create a heatmap of the front-end DTI ratio over home price and interest rate"""
+    # Heatmap rows follow the y axis, so transpose the (price, rate) grid to (rate, price)
+    z = grid.front_end_ratio.T
+    fig = go.Figure(data=[
+        go.Heatmap(
+            x=grid.home_price,
+            y=grid.interest_rate,
+            z=z,
+            colorscale='RdYlGn_r',
+            colorbar=dict(title="Front-End DTI (%)"),
+            hovertemplate='Price: $%{x:,.0f}<br>Rate: %{y:.2f}%<br>DTI: %{z:.1f}%<extra></extra>'
+        ),
+        go.Contour(
+            x=grid.home_price,
+            y=grid.interest_rate,
+            z=z,
+            contours=dict(start=28, end=28, coloring='none', showlabels=True),
+            line=dict(color='black', dash='dash', width=2),
+            showscale=False,
+            hoverinfo='skip',
+            name="28% DTI Threshold"
+        ),
+        go.Scatter(
+            x=[home_price],
+            y=[interest_rate],
+            mode='markers',
+            marker=dict(color='white', size=12, line=dict(color='black', width=2)),
+            name="Current Scenario"
+        )
+    ])
+    fig.update_layout(
+        title="Front-End DTI by Home Price and Interest Rate",
+        xaxis_title="Home Price ($)",
+        yaxis_title="Interest Rate (%)",
+        showlegend=False,
+        **BASE_LAYOUT
+    )
+    return fig
+
+
+# NOTE: create_comparison_charts (and this template) are not rendered by the app; render_charts
+# draws the per-input charts instead. The down payment panel plots dollars, unlike the
+# percent-of-price axis used elsewhere, and needs fixing before it is wired in.
+
+# Shared across sessions; the template is only ever copied, never mutated
+@st.cache_resource
+def _comparison_charts_template() -> go.Figure:
+    """Build the static 2x2 comparison layout (titles, axes, threshold line) once"""
+    # Only this chart needs subplots, so keep the import off the app's startup path
+    from plotly.subplots import make_subplots
+    
     fig = make_subplots(
         rows=2, cols=2,
         subplot_titles=(
@@ -213,69 +456,10 @@ def create_comparison_charts(data: List[Dict]) -> go.Figure:
                [{"secondary_y": False}, {"secondary_y": False}]]
     )
     
-    # Separate data by scenario type
-    price_data = [d for d in data if d['scenario_type'] == 'Price Variation']
-    rate_data = [d for d in data if d['scenario_type'] == 'Rate Variation']
-    dp_data = [d for d in data if d['scenario_type'] == 'Down Payment Variation']
-    
-    # Price variation
-    fig.add_trace(
-        go.Scatter(
-            x=[d['variable_value'] for d in price_data],
-            y=[d['monthly_payment'] for d in price_data],
-            mode='lines+markers',
-            name='Price vs Payment',
-            line=dict(color='blue'),
-            showlegend=False
-        ),
-        row=1, col=1
-    )
-    
-    # Rate variation
-    fig.add_trace(
-        go.Scatter(
-            x=[d['variable_value'] for d in rate_data],
-            y=[d['monthly_payment'] for d in rate_data],
-            mode='lines+markers',
-            name='Rate vs Payment',
-            line=dict(color='red'),
-            showlegend=False
-        ),
-        row=1, col=2
-    )
-    
-    # Down payment variation
-    fig.add_trace(
-        go.Scatter(
-            x=[d['variable_value'] for d in dp_data],
-            y=[d['monthly_payment'] for d in dp_data],
-            mode='lines+markers',
-            name='Down Payment vs Payment',
-            line=dict(color='green'),
-            showlegend=False
-        ),
-        row=2, col=1
-    )
-    
-    # DTI ratio comparison
-    colors = {'Price Variation': 'blue', 'Rate Variation': 'red', 'Down Payment Variation': 'green'}
-    for scenario_type in ['Price Variation', 'Rate Variation', 'Down Payment Variation']:
-        scenario_data = [d for d in data if d['scenario_type'] == scenario_type]
-        fig.add_trace(
-            go.Scatter(
-                x=[d['variable_value'] for d in scenario_data],
-                y=[d['front_end_ratio'] for d in scenario_data],
-                mode='lines+markers',
-                name=f'{scenario_type}',
-                line=dict(color=colors[scenario_type]),
-                showlegend=True
-            ),
-            row=2, col=2
-        )
-    
     # Add affordability threshold line
     fig.add_hline(y=28, line_dash="dash", line_color="orange", 
-                 annotation_text="28% DTI Threshold", row=2, col=2)
+                 annotation_text="28% DTI Threshold", row=2, col=2,
+                 exclude_empty_subplots=False)
     
     fig.update_layout(height=800)
     
@@ -292,6 +476,119 @@ def create_comparison_charts(data: List[Dict]) -> go.Figure:
     return fig
 
 
+# Keyed on the bytes of the comparison arrays; callers must not mutate the returned figure
+@st.cache_resource(max_entries=16)
+def create_comparison_charts(data: Dict[str, ComparisonArrays]) -> go.Figure:
+    """Create comparison charts for different scenarios"""
+    # Copy the prebuilt layout so only the data traces are added per call
+    fig = go.Figure(_comparison_charts_template())
+    
+    colors = {'Price Variation': 'blue', 'Rate Variation': 'red', 'Down Payment Variation': 'green'}
+    payment_names = {'Price Variation': 'Price vs Payment', 'Rate Variation': 'Rate vs Payment',
+                     'Down Payment Variation': 'Down Payment vs Payment'}
+    
+    # Payment variation panels followed by the DTI ratio comparison, added in one call
+    traces = [
+        go.Scatter(
+            x=data[scenario_type].variable_value,
+            y=data[scenario_type].monthly_payment,
+            mode='lines+markers',
+            name=payment_names[scenario_type],
+            line=dict(color=colors[scenario_type]),
+            showlegend=False
+        )
+        for scenario_type in SCENARIO_TYPES
+    ] + [
+        go.Scatter(
+            x=data[scenario_type].variable_value,
+            y=data[scenario_type].front_end_ratio,
+            mode='lines+markers',
+            name=f'{scenario_type}',
+            line=dict(color=colors[scenario_type]),
+            showlegend=True
+        )
+        for scenario_type in SCENARIO_TYPES
+    ]
+    fig.add_traces(traces, rows=[1, 1, 2, 2, 2, 2], cols=[1, 2, 1, 2, 2, 2])
+    
+    return fig
+
+
+@st.fragment
+def render_charts(scenario: MortgageScenario, metrics: Dict[str, Any]):
+    """Render the visual analysis section for the given scenario"""
+    st.subheader("📈 Visual Analysis")
+    
+    # First row - Payment breakdown and Price comparison
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Payment breakdown chart
+        # Round to whole dollars (the chart's display precision) so near-identical inputs share a figure
+        payment_chart = create_payment_breakdown_chart(
+            round(metrics['monthly_pi']),
+            round(metrics['monthly_property_tax']),
+            round(metrics['monthly_insurance']),
+            round(metrics['monthly_hoa'])
+        )
+        st.altair_chart(payment_chart, use_container_width=True)
+    
+    with col2:
+        # Generate comparison data
+        comparison_data = calc_comparison_data(scenario)
+        
+        # Create individual price comparison chart
+        price_data = comparison_data['Price Variation']
+        fig_price = get_payment_line_chart(
+            'price_chart', price_data.variable_value, price_data.monthly_payment,
+            "Monthly Payment vs Home Price", "Home Price ($)", 'blue'
+        )
+        st.plotly_chart(fig_price, use_container_width=True)
+    
+    # Second row - Interest rate and Down payment comparisons
+    col3, col4 = st.columns(2)
+    
+    with col3:
+        # Interest rate comparison chart
+        rate_data = comparison_data['Rate Variation']
+        fig_rate = get_payment_line_chart(
+            'rate_chart', rate_data.variable_value, rate_data.monthly_payment,
+            "Monthly Payment vs Interest Rate", "Interest Rate (%)", 'red'
+        )
+        st.plotly_chart(fig_rate, use_container_width=True)
+    
+    with col4:
+        # Down payment comparison chart
+        dp_data = comparison_data['Down Payment Variation']
+        fig_dp = get_payment_line_chart(
+            'dp_chart',
+            dp_data.variable_value / scenario.home_price * 100,  # Convert to percentage
+            dp_data.monthly_payment,
+            "Monthly Payment vs Down Payment %", "Down Payment (%)", 'green'
+        )
+        st.plotly_chart(fig_dp, use_container_width=True)
+    
+    # Third row - DTI Ratio comparison
+    st.subheader("📊 DTI Ratio Analysis")
+    col5, col6 = st.columns(2)
+    
+    with col5:
+        # DTI ratio comparison chart
+        fig_dti = create_dti_chart(comparison_data, scenario.home_price)
+        st.plotly_chart(fig_dti, use_container_width=True)
+    
+    with col6:
+        # Affordability summary chart
+        fig_afford = create_affordability_chart(comparison_data)
+        st.plotly_chart(fig_afford, use_container_width=True)
+    
+    # Fourth row - Price x rate affordability map
+    st.subheader("🗺️ Affordability Map")
+    grid = calc_affordability_grid(scenario)
+    fig_heatmap = create_affordability_heatmap(grid, scenario.home_price, scenario.interest_rate)
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+
 def main():
     st.set_page_config(
         page_title="Home Affordability Calculator",
@@ -302,7 +599,7 @@ def main():
     
     st.title("🏠 Home Affordability Calculator")
     st.caption("📍 Redmond, Washington")
-    st.markdown("---")
+    st.divider()
     
     # Sidebar inputs
     st.sidebar.header("📊 Input Parameters")
@@ -314,10 +611,6 @@ def main():
     if 'down_payment_amount' not in st.session_state:
         st.session_state.down_payment_amount = 900000
     
-    # Initialize property tax in session state if not exists
-    if 'property_tax_annual' not in st.session_state:
-        st.session_state.property_tax_annual = int(home_price * PROPERTY_TAX_RATE)
-    
     # Initialize insurance in session state if not exists
     if 'insurance_annual' not in st.session_state:
         st.session_state.insurance_annual = DEFAULT_INSURANCE_ANNUAL
@@ -351,7 +644,8 @@ def main():
     monthly_income = st.sidebar.number_input("Monthly Income ($)", min_value=1000, max_value=100000, value=30000, step=500)
     monthly_debts = st.sidebar.number_input("Monthly Debts ($)", min_value=0, max_value=50000, value=4000, step=100)
     
-    # Update property tax default based on home price
+    # Initialize property tax (and the price it was derived from) on first run, and reset
+    # it to the default whenever the home price changes
     default_property_tax = int(home_price * PROPERTY_TAX_RATE)
     if 'property_tax_annual' not in st.session_state or st.session_state.get('last_home_price') != home_price:
         st.session_state.property_tax_annual = default_property_tax
@@ -385,7 +679,7 @@ def main():
     
     hoa_monthly = st.sidebar.number_input("HOA (Monthly $)", min_value=0, max_value=2000, value=75, step=25)
     
-    # Create scenario and calculate metrics
+    # Create scenario and calculate metrics (cached on the scenario's values across reruns)
     scenario = MortgageScenario(
         home_price=home_price,
         down_payment_amount=down_payment_amount,
@@ -398,191 +692,30 @@ def main():
         hoa_monthly=hoa_monthly
     )
     
-    metrics = MortgageModel.calculate_affordability_metrics(scenario)
+    metrics = calc_metrics(scenario)
     
     # Main content area
-    col1, col2, col3 = st.columns([1, 1, 1])
+    col1, col2 = st.columns([2, 1])
     
     with col1:
-        st.subheader("💰 Loan Details")
-        st.metric("Loan Amount", f"${metrics['loan_amount']:,.0f}")
-        st.metric("Down Payment", f"${metrics['down_payment']:,.0f}")
-        st.caption(f"({metrics['down_payment_percent']:.1f}% of home price)")
-        st.metric("Monthly P&I", f"${metrics['monthly_pi']:,.0f}")
+        st.subheader("💰 Loan Details & Monthly Costs")
+        st.dataframe(create_metrics_table(metrics), hide_index=True, use_container_width=True)
         
     with col2:
-        st.subheader("📋 Monthly Costs")
-        st.metric("Property Tax", f"${metrics['monthly_property_tax']:,.0f}")
-        st.metric("Insurance", f"${metrics['monthly_insurance']:,.0f}")
-        st.metric("HOA", f"${hoa_monthly:,.0f}")
-        st.metric("**Total Monthly**", f"**${metrics['total_monthly_payment']:,.0f}**")
-        
-    with col3:
         st.subheader("📊 Affordability")
         
-        # Color code the ratios
-        front_color = "green" if metrics['front_end_ratio'] <= 28 else "red"
-        back_color = "green" if metrics['back_end_ratio'] <= 36 else "red"
-        
-        st.metric("Front-End Ratio", f"{metrics['front_end_ratio']:.1f}%")
-        st.markdown(f"<p style='color: {front_color}'>{'✅ Good' if metrics['front_end_ratio'] <= 28 else '❌ High'} (≤28% recommended)</p>", unsafe_allow_html=True)
-        
-        st.metric("Back-End Ratio", f"{metrics['back_end_ratio']:.1f}%")
-        st.markdown(f"<p style='color: {back_color}'>{'✅ Good' if metrics['back_end_ratio'] <= 36 else '❌ High'} (≤36% recommended)</p>", unsafe_allow_html=True)
-        
         if metrics['affordable']:
             st.success("🎉 This home appears affordable!")
         else:
             st.error("⚠️ This home may be beyond your budget")
     
-    st.markdown("---")
+    st.divider()
     
-    # Charts section
-    st.subheader("📈 Visual Analysis")
-    
-    # First row - Payment breakdown and Price comparison
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Payment breakdown chart
-        payment_chart = create_payment_breakdown_chart(metrics)
-        st.plotly_chart(payment_chart, use_container_width=True)
-    
-    with col2:
-        # Generate comparison data
-        comparison_data = MortgageModel.generate_comparison_data(
-            scenario,
-            price_range=(home_price * 0.7, home_price * 1.3),
-            rate_range=(max(1, interest_rate - 2), interest_rate + 2),
-            down_payment_range=(home_price * 0.05, home_price * 0.80)  # 5% to 80% of home price
-        )
-        
-        # Create individual price comparison chart
-        price_data = [d for d in comparison_data if d['scenario_type'] == 'Price Variation']
-        fig_price = go.Figure()
-        fig_price.add_trace(go.Scatter(
-            x=[d['variable_value'] for d in price_data],
-            y=[d['monthly_payment'] for d in price_data],
-            mode='lines+markers',
-            name='Monthly Payment',
-            line=dict(color='blue')
-        ))
-        fig_price.update_layout(
-            title="Monthly Payment vs Home Price",
-            xaxis_title="Home Price ($)",
-            yaxis_title="Monthly Payment ($)",
-            height=400
-        )
-        st.plotly_chart(fig_price, use_container_width=True)
-    
-    # Second row - Interest rate and Down payment comparisons
-    col3, col4 = st.columns(2)
-    
-    with col3:
-        # Interest rate comparison chart
-        rate_data = [d for d in comparison_data if d['scenario_type'] == 'Rate Variation']
-        fig_rate = go.Figure()
-        fig_rate.add_trace(go.Scatter(
-            x=[d['variable_value'] for d in rate_data],
-            y=[d['monthly_payment'] for d in rate_data],
-            mode='lines+markers',
-            name='Monthly Payment',
-            line=dict(color='red')
-        ))
-        fig_rate.update_layout(
-            title="Monthly Payment vs Interest Rate",
-            xaxis_title="Interest Rate (%)",
-            yaxis_title="Monthly Payment ($)",
-            height=400
-        )
-        st.plotly_chart(fig_rate, use_container_width=True)
-    
-    with col4:
-        # Down payment comparison chart
-        dp_data = [d for d in comparison_data if d['scenario_type'] == 'Down Payment Variation']
-        fig_dp = go.Figure()
-        fig_dp.add_trace(go.Scatter(
-            x=[(d['variable_value'] / home_price * 100) for d in dp_data],  # Convert to percentage
-            y=[d['monthly_payment'] for d in dp_data],
-            mode='lines+markers',
-            name='Monthly Payment',
-            line=dict(color='green')
-        ))
-        fig_dp.update_layout(
-            title="Monthly Payment vs Down Payment %",
-            xaxis_title="Down Payment (%)",
-            yaxis_title="Monthly Payment ($)",
-            height=400
-        )
-        st.plotly_chart(fig_dp, use_container_width=True)
-    
-    # Third row - DTI Ratio comparison
-    st.subheader("📊 DTI Ratio Analysis")
-    col5, col6 = st.columns(2)
-    
-    with col5:
-        # DTI ratio comparison chart
-        fig_dti = go.Figure()
-        colors = {'Price Variation': 'blue', 'Rate Variation': 'red', 'Down Payment Variation': 'green'}
-        for scenario_type in ['Price Variation', 'Rate Variation', 'Down Payment Variation']:
-            scenario_data = [d for d in comparison_data if d['scenario_type'] == scenario_type]
-            if scenario_type == 'Down Payment Variation':
-                x_values = [(d['variable_value'] / home_price * 100) for d in scenario_data]
-                x_title = "Down Payment (%)"
-            elif scenario_type == 'Price Variation':
-                x_values = [d['variable_value'] for d in scenario_data]
-                x_title = "Home Price ($)"
-            else:
-                x_values = [d['variable_value'] for d in scenario_data]
-                x_title = "Interest Rate (%)"
-            
-            fig_dti.add_trace(go.Scatter(
-                x=x_values,
-                y=[d['front_end_ratio'] for d in scenario_data],
-                mode='lines+markers',
-                name=f'{scenario_type}',
-                line=dict(color=colors[scenario_type])
-            ))
-        
-        fig_dti.add_hline(y=28, line_dash="dash", line_color="orange", 
-                         annotation_text="28% DTI Threshold")
-        fig_dti.update_layout(
-            title="DTI Ratio Comparison",
-            xaxis_title="Variable Value",
-            yaxis_title="Front-End DTI Ratio (%)",
-            height=400
-        )
-        st.plotly_chart(fig_dti, use_container_width=True)
-    
-    with col6:
-        # Affordability summary chart
-        affordability_counts = {}
-        for scenario_type in ['Price Variation', 'Rate Variation', 'Down Payment Variation']:
-            scenario_data = [d for d in comparison_data if d['scenario_type'] == scenario_type]
-            affordable_count = sum(1 for d in scenario_data if d['affordable'])
-            total_count = len(scenario_data)
-            affordability_counts[scenario_type] = (affordable_count / total_count) * 100
-        
-        fig_afford = go.Figure(data=[
-            go.Bar(
-                x=list(affordability_counts.keys()),
-                y=list(affordability_counts.values()),
-                marker_color=['blue', 'red', 'green'],
-                text=[f"{v:.0f}%" for v in affordability_counts.values()],
-                textposition='auto'
-            )
-        ])
-        fig_afford.update_layout(
-            title="Affordability Rate by Scenario",
-            xaxis_title="Scenario Type",
-            yaxis_title="Affordable Scenarios (%)",
-            height=400,
-            yaxis=dict(range=[0, 100])
-        )
-        st.plotly_chart(fig_afford, use_container_width=True)
+    # Charts section (a fragment, so future chart-local controls can rerun just the charts)
+    render_charts(scenario, metrics)
     
     # Additional insights
-    st.markdown("---")
+    st.divider()
     st.subheader("💡 Key Insights")
     
     col1, col2, col3 = st.columns(3)
@@ -601,7 +734,7 @@ def main():
         st.caption("At 20% income savings rate")
     
     # Footer
-    st.markdown("---")
+    st.divider()
     st.markdown("*Calculator uses standard mortgage formulas. Front-end ratio ≤28% and back-end ratio ≤36% are considered affordable.*")
 
 
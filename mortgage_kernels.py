@@ -0,0 +1,78 @@
+# mortgage_kernels.py - Batch mortgage kernels for the Home Affordability Calculator
+#
+# Kept out of main.py because Streamlit re-executes the app script on every rerun; an imported
+# module stays in sys.modules, so the sweep ramp and Numba dispatcher below are built once per
+# process.
+
+from functools import lru_cache
+import numpy as np
+
+COMPARISON_POINTS = 10  # Points per comparison sweep
+# Fractions 0..1 shared by every sweep, scaled per call instead of calling np.linspace
+SWEEP_RAMP = np.arange(COMPARISON_POINTS, dtype=np.float64) / (COMPARISON_POINTS - 1)
+SWEEP_RAMP.flags.writeable = False  # Shared by every session; guard against in-place edits
+
+
+def payment_factor(annual_rate, years: int) -> np.ndarray:
+    """Monthly payment per dollar of principal for a scalar or array of annual rates"""
+    annual_rate = np.asarray(annual_rate, dtype=float)
+    monthly_rate = annual_rate / 12 / 100
+    num_payments = years * 12
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth_less_one = np.expm1(num_payments * np.log1p(monthly_rate))
+        factor = monthly_rate * (growth_less_one + 1) / growth_less_one
+    
+    # Zero-rate loans fall back to straight-line repayment, as in MortgageModel.calculate_monthly_payment
+    return np.where(annual_rate == 0, 1 / num_payments, factor)
+
+
+def mortgage_batch_numpy(inputs, monthly_income: float, monthly_debts: float, monthly_fixed: float):
+    """Monthly P&I, total payment, front-end ratio and affordability for a batch of scenarios"""
+    # One row per input, one column per scenario
+    price, down_payment, factor, monthly_tax = inputs
+    # Front and back ratios share the payment term; only the scalar debt share differs
+    income_scale = 100 / monthly_income
+    debt_ratio = monthly_debts * income_scale
+    monthly_pi = (price - down_payment) * factor
+    total_monthly_payment = monthly_pi + monthly_tax + monthly_fixed
+    front_end_ratio = total_monthly_payment * income_scale
+    back_end_ratio = front_end_ratio + debt_ratio
+    return monthly_pi, total_monthly_payment, front_end_ratio, (front_end_ratio <= 28) & (back_end_ratio <= 36)
+
+
+def mortgage_batch_loop(inputs, monthly_income, monthly_debts, monthly_fixed):
+    """Single-pass loop form of mortgage_batch_numpy, meant to be compiled by Numba"""
+    n = inputs.shape[1]
+    monthly_pi = np.empty(n)
+    total_monthly_payment = np.empty(n)
+    front_end_ratio = np.empty(n)
+    affordable = np.empty(n, dtype=np.bool_)
+    income_scale = 100 / monthly_income
+    debt_ratio = monthly_debts * income_scale
+    
+    for i in range(n):
+        pi = (inputs[0, i] - inputs[1, i]) * inputs[2, i]
+        total = pi + inputs[3, i] + monthly_fixed
+        front = total * income_scale
+        back = front + debt_ratio
+        monthly_pi[i] = pi
+        total_monthly_payment[i] = total
+        front_end_ratio[i] = front
+        # Non-short-circuiting & keeps the loop body branch-free
+        affordable[i] = (front <= 28) & (back <= 36)
+    
+    return monthly_pi, total_monthly_payment, front_end_ratio, affordable
+
+
+@lru_cache(maxsize=None)
+def load_mortgage_batch():
+    """Resolve the scenario kernel on first use so importing Numba stays off the first paint"""
+    try:
+        from numba import njit
+    except ImportError:  # Numba is optional; fall back to the NumPy kernel
+        return mortgage_batch_numpy
+    
+    # cache=True writes the compiled kernel to __pycache__ so later app launches skip the JIT step;
+    # nogil=True lets concurrent sessions (each on its own script thread) run the kernel in parallel
+    return njit(cache=True, fastmath=True, nogil=True)(mortgage_batch_loop)